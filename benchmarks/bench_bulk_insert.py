@@ -0,0 +1,70 @@
+"""
+Compare rows/sec of the per object ORM path against the Core bulk path when
+storing a freshly fetched feed and subscribing a user to it
+
+    python -m benchmarks.bench_bulk_insert [ROWS]
+"""
+
+import sys
+import time
+
+from feeder import create_app
+from feeder.bulk import insert_entries, insert_user_entries
+from feeder.db import db
+from feeder.models import Category, Entry, Feed, Subscription, UserEntry
+from feeder.parser import Entry as ParsedEntry
+
+
+def make_entries(count):
+    return [
+        ParsedEntry(
+            title=f"Entry {i}",
+            link=f"https://example.com/{i}",
+            summary=f"Summary {i}",
+        )
+        for i in range(count)
+    ]
+
+
+def make_subscription(feed_link):
+    feed = Feed(title="bench", feed_link=feed_link)
+    subscription = Subscription(
+        user_id=1, feed=feed, category=Category(name="bench", user_id=1)
+    )
+    db.session.add(subscription)
+    db.session.flush()
+    return subscription
+
+
+def orm(entries):
+    subscription = make_subscription("https://example.com/orm.xml")
+    feed = subscription.feed
+    feed.entries = [Entry(**entry.as_dict()) for entry in entries]
+    for entry in feed.entries:
+        db.session.add(
+            UserEntry(user_id=1, entry=entry, read=False, subscription=subscription)
+        )
+    db.session.commit()
+
+
+def bulk(entries):
+    subscription = make_subscription("https://example.com/bulk.xml")
+    entry_ids = insert_entries(subscription.feed_id, entries)
+    insert_user_entries(1, subscription.id, entry_ids)
+    db.session.commit()
+
+
+def main(rows=50_000):
+    entries = make_entries(rows)
+    for name, path in [("orm", orm), ("bulk", bulk)]:
+        app = create_app(db_uri="sqlite://")
+        with app.app_context():
+            start = time.perf_counter()
+            path(entries)
+            elapsed = time.perf_counter() - start
+        # Every entry also gets a user entry
+        print(f"{name:>5}: {rows * 2 / elapsed:>10,.0f} rows/sec ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,68 @@
+"""
+Compare memory held by parsed entries as slotted Entry objects against the
+per entry dicts the parsers used to return
+
+    python -m benchmarks.bench_parsed_entries [FEEDS] [ENTRIES]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+import xmltodict
+
+from feeder.parser import make_parser
+
+ITEM = """
+<item>
+  <title>Entry {i} from feed {feed}</title>
+  <link>https://feed{feed}.example.com/posts/{i}</link>
+  <description>Summary {i}</description>
+  <pubDate>Mon, 03 Apr 2023 12:00:00 GMT</pubDate>
+</item>
+"""
+
+
+def make_feed(feed, entries):
+    items = "".join(ITEM.format(i=i, feed=feed) for i in range(entries))
+    return f"""<?xml version="1.0"?>
+    <rss version="2.0">
+      <channel>
+        <title>Feed {feed}</title>
+        <link>https://feed{feed}.example.com</link>
+        {items}
+      </channel>
+    </rss>
+    """
+
+
+def parse(content):
+    _, entries = make_parser(xmltodict.parse(content)).parse()
+    return entries
+
+
+def as_dicts(content):
+    return [entry.as_dict() for entry in parse(content)]
+
+
+def measure(parse, feeds):
+    gc.collect()
+    tracemalloc.start()
+    held = [parse(content) for content in feeds]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return size
+
+
+def main(feeds=50, entries=1000):
+    contents = [make_feed(feed, entries) for feed in range(feeds)]
+    total = feeds * entries
+    for name, path in [("dict", as_dicts), ("slots", parse)]:
+        size = measure(path, contents)
+        print(f"{name:>5}: {size / 2**20:>8.1f} MiB ({size / total:,.0f} bytes/entry)")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
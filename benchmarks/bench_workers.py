@@ -0,0 +1,64 @@
+"""
+Measure how refresh throughput scales with the number of workers sharing one
+database, with the fetch replaced by a fixed delay per batch
+
+    python -m benchmarks.bench_workers [FEEDS] [LATENCY_MS]
+"""
+
+import datetime as dt
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from feeder import create_app
+from feeder.db import db
+from feeder.models import Feed
+from feeder.worker import claim_feeds, release_feeds
+
+BATCH_SIZE = 10
+WORKERS = [1, 2, 4, 8]
+
+
+def work(app, name, latency):
+    with app.app_context():
+        while feed_ids := claim_feeds(name, BATCH_SIZE):
+            db.session.commit()
+            time.sleep(latency)
+            release_feeds(name, feed_ids)
+            db.session.commit()
+
+
+def run(workers, feeds, latency):
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{directory}/bench.db"
+        app = create_app()
+        with app.app_context():
+            stale = dt.datetime.utcnow() - dt.timedelta(days=1)
+            db.session.add_all(
+                Feed(title=str(i), feed_link=str(i), refreshed_at=stale)
+                for i in range(feeds)
+            )
+            db.session.commit()
+
+        threads = [
+            threading.Thread(target=work, args=(app, str(i), latency))
+            for i in range(workers)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+
+def main(feeds=1000, latency_ms=50):
+    for workers in WORKERS:
+        elapsed = run(workers, feeds, latency_ms / 1000)
+        print(f"{workers} workers: {feeds / elapsed:>8,.0f} feeds/sec")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
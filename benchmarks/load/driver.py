@@ -0,0 +1,226 @@
+"""
+Fire a weighted mix of GraphQL queries at create_app() from several threads
+and report latency percentiles and throughput
+
+    python -m benchmarks.load.driver sqlite:///load.db --duration 30
+
+Point it at a database filled by benchmarks.load.generate. With
+--feed-server (see benchmarks.load.feed_server) the mix also subscribes
+users to new feeds, exercising fetching.
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from itertools import count
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from feeder import create_app
+from feeder.db import db
+from feeder.models import Entry, Subscription, User, UserEntry
+
+SAMPLE_SIZE = 500
+
+
+class Query(NamedTuple):
+    weight: int
+    query: str
+    variables: Callable[["Sample", random.Random], Dict]
+
+
+class Sample(NamedTuple):
+    """Ids to aim queries at, picked before the run starts"""
+
+    users: List[int]
+    subscriptions: List[int]
+    entries: List[int]
+    user_entries: List[tuple]
+    feed_server: Optional[str]
+    feed_ids: count
+
+
+QUERIES = {
+    "subscriptions": Query(
+        40,
+        """
+        query Subscriptions($id: ID!) {
+          user(id: $id) {
+            subscriptions { id unreadCount feed { title } category { name } }
+          }
+        }
+        """,
+        lambda sample, rng: {"id": rng.choice(sample.users)},
+    ),
+    "entries": Query(
+        30,
+        """
+        query Entries($id: ID!) {
+          subscription(id: $id) {
+            entries { id read entry { title excerpt readingTime published } }
+          }
+        }
+        """,
+        lambda sample, rng: {"id": rng.choice(sample.subscriptions)},
+    ),
+    "entry": Query(
+        15,
+        """
+        query Entry($id: ID!) {
+          entry(id: $id) { title link content }
+        }
+        """,
+        lambda sample, rng: {"id": rng.choice(sample.entries)},
+    ),
+    "mark_as_read": Query(
+        15,
+        """
+        mutation MarkAsRead($id: ID!, $userId: ID!) {
+          markAsRead(id: $id, userId: $userId) { id }
+        }
+        """,
+        lambda sample, rng: dict(
+            zip(("id", "userId"), rng.choice(sample.user_entries))
+        ),
+    ),
+    "add_subscription": Query(
+        5,
+        """
+        mutation AddSubscription($url: String!, $userId: Int!) {
+          addSubscription(url: $url, userId: $userId, category: "load") { id }
+        }
+        """,
+        lambda sample, rng: {
+            "url": f"{sample.feed_server}/load{next(sample.feed_ids)}.rss",
+            "userId": rng.choice(sample.users),
+        },
+    ),
+}
+
+
+class Result(NamedTuple):
+    query: str
+    latency: float
+    ok: bool
+
+
+def random_ids(column, rng: random.Random) -> List:
+    highest = db.session.scalar(select(func.max(column))) or 0
+    return rng.sample(range(1, highest + 1), min(SAMPLE_SIZE, highest))
+
+
+def take_sample(rng: random.Random, feed_server: Optional[str]) -> Sample:
+    user_entries = db.session.execute(
+        select(UserEntry.id, UserEntry.user_id).where(
+            UserEntry.id.in_(random_ids(UserEntry.id, rng))
+        )
+    )
+    return Sample(
+        users=random_ids(User.id, rng),
+        subscriptions=random_ids(Subscription.id, rng),
+        entries=random_ids(Entry.id, rng),
+        user_entries=[tuple(row) for row in user_entries],
+        feed_server=feed_server,
+        feed_ids=count(),
+    )
+
+
+def percentile(latencies: List[float], n: int) -> float:
+    if len(latencies) < 2:
+        return latencies[0] if latencies else 0
+    return statistics.quantiles(latencies, n=100)[n - 1]
+
+
+def run(
+    app,
+    duration: float = 10,
+    concurrency: int = 4,
+    feed_server: Optional[str] = None,
+    seed: int = 0,
+) -> Tuple[List[Result], float]:
+    """Return the results, and how long the run really took in seconds"""
+    rng = random.Random(seed)
+    with app.app_context():
+        sample = take_sample(rng, feed_server)
+
+    mix = {
+        name: query
+        for name, query in QUERIES.items()
+        if feed_server or name != "add_subscription"
+    }
+    names = list(mix)
+    weights = [query.weight for query in mix.values()]
+
+    results: List[Result] = []
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def work(worker_seed):
+        rng = random.Random(worker_seed)
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            [name] = rng.choices(names, weights)
+            query = mix[name]
+            variables = query.variables(sample, rng)
+            start = time.perf_counter()
+            response = client.post(
+                "/graphql", json={"query": query.query, "variables": variables}
+            )
+            latency = time.perf_counter() - start
+            ok = response.status_code == 200 and not response.json.get("errors")
+            results.append(Result(name, latency, ok))
+
+    threads = [
+        threading.Thread(target=work, args=(seed + i,)) for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Requests in flight at the deadline finish after it
+    return results, time.perf_counter() - started
+
+
+def report(results: List[Result], elapsed: float):
+    by_query = defaultdict(list)
+    for result in results:
+        by_query[result.query].append(result)
+    by_query["total"] = results
+
+    print(f"{'query':<18}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, query_results in by_query.items():
+        latencies = [result.latency * 1000 for result in query_results]
+        errors = sum(not result.ok for result in query_results)
+        print(
+            f"{name:<18}{len(query_results):>8}{errors:>8}"
+            f"{percentile(latencies, 50):>10.1f}{percentile(latencies, 99):>10.1f}"
+        )
+    print(f"throughput: {len(results) / elapsed:,.1f} requests/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("db_uri")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--feed-server", help="e.g. http://127.0.0.1:8001")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app(db_uri=args.db_uri)
+    results, elapsed = run(
+        app,
+        duration=args.duration,
+        concurrency=args.concurrency,
+        feed_server=args.feed_server,
+        seed=args.seed,
+    )
+    report(results, elapsed)
+
+
+if __name__ == "__main__":
+    main()
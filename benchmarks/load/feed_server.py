@@ -0,0 +1,178 @@
+"""
+A local HTTP server serving synthetic RSS and Atom feeds, so fetching can be
+load tested without touching the internet
+
+    python -m benchmarks.load.feed_server [--port 8001]
+
+Any path ending .rss or .atom is a feed, the rest of the path names it. The
+query string shapes the response:
+
+    entries      number of entries (default 20)
+    size         bytes of content per entry (default 1000)
+    latency      milliseconds to wait before responding (default 0)
+    status       always respond with this status code
+    error_rate   fraction of requests answered with a 500 (default 0)
+
+Responses carry an ETag and Last-Modified, and a matching If-None-Match or
+If-Modified-Since gets a 304.
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from email.utils import formatdate
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+
+LAST_MODIFIED = formatdate(1680523200, usegmt=True)
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do".split()
+
+RSS_ITEM = """<item>
+<title>{title}</title>
+<link>{link}</link>
+<guid>{link}</guid>
+<pubDate>{published}</pubDate>
+<description>{content}</description>
+</item>"""
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+<title>{title}</title>
+<link>{site_link}</link>
+{entries}
+</channel></rss>"""
+
+ATOM_ENTRY = """<entry>
+<title>{title}</title>
+<link href="{link}" rel="alternate"/>
+<id>{link}</id>
+<updated>{updated}</updated>
+<content type="html">{content}</content>
+</entry>"""
+
+ATOM = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<title>{title}</title>
+<link href="{site_link}" rel="alternate"/>
+<link href="{feed_link}" rel="self"/>
+{entries}
+</feed>"""
+
+
+def make_content(size: int, seed: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = WORDS[(seed + len(words)) % len(WORDS)]
+        words.append(word)
+        length += len(word) + 1
+    return escape(f'<p>{" ".join(words)}</p><a href="/about">about</a>')
+
+
+def make_feed(name: str, kind: str, feed_link: str, entries: int, size: int) -> str:
+    site_link = f"https://{name}.example.com/"
+    timestamp = 1680523200
+    if kind == "atom":
+        template, entry_template = ATOM, ATOM_ENTRY
+    else:
+        template, entry_template = RSS, RSS_ITEM
+    rendered = "".join(
+        entry_template.format(
+            title=f"{name} entry {i}",
+            link=f"{site_link}posts/{i}",
+            published=formatdate(timestamp - i * 3600, usegmt=True),
+            updated=time.strftime(
+                "%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp - i * 3600)
+            ),
+            content=make_content(size, i),
+        )
+        for i in range(entries)
+    )
+    return template.format(
+        title=name, site_link=site_link, feed_link=escape(feed_link), entries=rendered
+    )
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def options(self) -> Dict[str, str]:
+        query = parse_qs(urlparse(self.path).query)
+        return {key: values[-1] for key, values in query.items()}
+
+    def respond(self, status: int, body: bytes = b"", headers: Tuple = ()):
+        self.send_response(status)
+        for header in headers:
+            self.send_header(*header)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        options = self.options()
+
+        latency = float(options.get("latency", 0))
+        if latency:
+            time.sleep(latency / 1000)
+
+        if "status" in options:
+            return self.respond(int(options["status"]))
+
+        if random.random() < float(options.get("error_rate", 0)):
+            return self.respond(500)
+
+        name, _, kind = path.strip("/").rpartition(".")
+        if kind not in {"rss", "atom"} or not name:
+            return self.respond(404)
+
+        etag = f'"{hashlib.sha1(self.path.encode()).hexdigest()}"'
+        headers = (("ETag", etag), ("Last-Modified", LAST_MODIFIED))
+        if (
+            self.headers.get("If-None-Match") == etag
+            or self.headers.get("If-Modified-Since") == LAST_MODIFIED
+        ):
+            return self.respond(304, headers=headers)
+
+        host = self.headers.get("Host", "localhost")
+        body = make_feed(
+            name.replace("/", "-"),
+            kind,
+            feed_link=f"http://{host}{self.path}",
+            entries=int(options.get("entries", 20)),
+            size=int(options.get("size", 1000)),
+        ).encode()
+        content_type = (
+            "application/atom+xml" if kind == "atom" else "application/rss+xml"
+        )
+        self.respond(200, body, headers + (("Content-Type", content_type),))
+
+
+def start(host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve from a background thread, port 0 picks a free one"""
+    server = ThreadingHTTPServer((host, port), FeedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), FeedHandler)
+    print(f"Serving feeds on http://{args.host}:{args.port}/")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Fill a database with users, subscriptions and user entries for load testing
+
+    python -m benchmarks.load.generate sqlite:///load.db --users 1000
+
+Every subscription gets a user entry for each entry in its feed, so the
+defaults (1000 users, 50 subscriptions each, 100 entries per feed) make 5
+million user entries.
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import func, select
+
+from feeder import create_app
+from feeder.bulk import bulk_insert, insert_entries
+from feeder.db import db
+from feeder.models import Category, Feed, Subscription, User, UserEntry
+from feeder.parser import Entry as ParsedEntry
+
+CATEGORIES = ["news", "tech", "blogs", "comics", "music"]
+
+
+def make_entries(feed: int, count: int):
+    site_link = f"https://feed{feed}.example.com/"
+    return [
+        ParsedEntry(
+            title=f"Feed {feed} entry {i}",
+            link=f"{site_link}posts/{i}",
+            content=f"<p>Entry {i} of feed {feed}, " + "lorem ipsum " * 100 + "</p>",
+        )
+        for i in range(count)
+    ]
+
+
+def generate(
+    users: int = 1000,
+    feeds: int = 500,
+    subscriptions: int = 50,
+    entries: int = 100,
+    read_ratio: float = 0.5,
+    seed: int = 0,
+):
+    """Must be called inside an app context"""
+    rng = random.Random(seed)
+    subscriptions = min(subscriptions, feeds)
+
+    feed_entries = {}
+    for i in range(feeds):
+        feed = Feed(
+            title=f"Feed {i}",
+            site_link=f"https://feed{i}.example.com/",
+            feed_link=f"https://feed{i}.example.com/feed.xml",
+        )
+        db.session.add(feed)
+        db.session.flush()
+        feed_entries[feed.id] = insert_entries(
+            feed.id, make_entries(i, entries), base_url=feed.site_link
+        )
+    db.session.commit()
+
+    feed_ids = list(feed_entries)
+    first_user = (db.session.scalar(select(func.max(User.id))) or 0) + 1
+    for user_id in range(first_user, first_user + users):
+        db.session.add(
+            User(id=user_id, email=f"user{user_id}@example.com", password="")
+        )
+        categories = [Category(name=name, user_id=user_id) for name in CATEGORIES]
+        db.session.add_all(categories)
+        db.session.flush()
+
+        for feed_id in rng.sample(feed_ids, subscriptions):
+            subscription = Subscription(
+                user_id=user_id, feed_id=feed_id, category=rng.choice(categories)
+            )
+            db.session.add(subscription)
+            db.session.flush()
+            bulk_insert(
+                UserEntry.__table__,
+                (
+                    {
+                        "user_id": user_id,
+                        "subscription_id": subscription.id,
+                        "entry_id": entry_id,
+                        "read": rng.random() < read_ratio,
+                    }
+                    for entry_id in feed_entries[feed_id]
+                ),
+            )
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("db_uri")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--feeds", type=int, default=500)
+    parser.add_argument("--subscriptions", type=int, default=50, help="per user")
+    parser.add_argument("--entries", type=int, default=100, help="per feed")
+    parser.add_argument("--read-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app(db_uri=args.db_uri)
+    start = time.perf_counter()
+    with app.app_context():
+        generate(
+            users=args.users,
+            feeds=args.feeds,
+            subscriptions=args.subscriptions,
+            entries=args.entries,
+            read_ratio=args.read_ratio,
+            seed=args.seed,
+        )
+        user_entries = db.session.scalar(select(func.count(UserEntry.id)))
+    elapsed = time.perf_counter() - start
+    print(f"{user_entries:,} user entries in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,18 @@ def create_app(db_uri="sqlite+pysqlite:///test.db"):
 
     db.init_app(app)
 
+    from .archive import export_command, export_view, import_command, import_view
+    from .worker import refresh_command
+
+    app.add_url_rule("/users/<int:user_id>/export", view_func=export_view)
+    app.add_url_rule(
+        "/users/<int:user_id>/import", view_func=import_view, methods=["POST"]
+    )
+
+    app.cli.add_command(refresh_command)
+    app.cli.add_command(export_command)
+    app.cli.add_command(import_command)
+
     with app.app_context():
         db.create_all()
         if not db.session.get(User, 1):
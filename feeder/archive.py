@@ -0,0 +1,295 @@
+"""
+Export and import everything about a user as newline delimited JSON, one
+record per line:
+
+    {"type": "feeder", "version": 1}
+    {"type": "category", "name": "news"}
+    {"type": "subscription", "id": 1, "feed_link": ..., "category": "news"}
+    {"type": "entry", "subscription": 1, "link": ..., "title": ...}
+    {"type": "read", "subscription": 1, "link": ..., "title": ...}
+
+Entries are optional. Read state is keyed on the entry link, and carries
+the entry's title and published date, so it survives an import into a
+different database. Read entries that don't exist there yet are created
+from just those fields, and since a refresh skips links it already knows
+they stay without content unless the archive includes entries. Exports
+stream rows with server side cursors and imports write in batches, so
+neither holds more than a batch in memory.
+"""
+
+import datetime as dt
+import io
+import json
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Iterator, List
+
+import click
+from flask import Response, abort, request, stream_with_context
+from flask.cli import with_appcontext
+from sqlalchemy import select, update
+
+from .bulk import insert_entries, insert_user_entries, unseen_entries
+from .db import db
+from .models import Category, Entry, Feed, Subscription, User, UserEntry
+from .parser import Entry as ParsedEntry
+from .resolvers import get_or_create_category, subscribe
+
+VERSION = 1
+
+# Keeps IN lists under SQLite's bound variable limit, see feeder.bulk
+BATCH_SIZE = 500
+
+ENTRY_FIELDS = ["link", "title", "published", "updated", "summary", "content"]
+
+
+def dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, default=dt.datetime.isoformat) + "\n"
+
+
+def parse_datetime(value: Any) -> Any:
+    return dt.datetime.fromisoformat(value) if value else None
+
+
+def stream(statement):
+    return db.session.execute(statement.execution_options(yield_per=BATCH_SIZE))
+
+
+def export_user(user_id: int, entries: bool = False) -> Iterator[str]:
+    yield dumps({"type": "feeder", "version": VERSION})
+
+    categories = select(Category.name).where(Category.user_id == user_id)
+    for (name,) in stream(categories):
+        yield dumps({"type": "category", "name": name})
+
+    subscriptions = (
+        select(
+            Subscription.id,
+            Subscription.feed_id,
+            Feed.feed_link,
+            Feed.site_link,
+            Feed.title,
+            Category.name,
+        )
+        .join(Feed)
+        .outerjoin(Category)
+        .where(Subscription.user_id == user_id)
+    )
+    # Fetched up front, there are only ever a few hundred and the queries for
+    # each one's entries need the connection
+    for id, feed_id, feed_link, site_link, title, category in db.session.execute(
+        subscriptions
+    ).all():
+        yield dumps(
+            {
+                "type": "subscription",
+                "id": id,
+                "feed_link": feed_link,
+                "site_link": site_link,
+                "title": title,
+                "category": category,
+            }
+        )
+
+        if entries:
+            feed_entries = select(
+                *(getattr(Entry, field) for field in ENTRY_FIELDS)
+            ).where(Entry.feed_id == feed_id)
+            for row in stream(feed_entries):
+                yield dumps({"type": "entry", "subscription": id, **row._asdict()})
+
+        read = (
+            select(Entry.link, Entry.title, Entry.published)
+            .join(UserEntry, UserEntry.entry_id == Entry.id)
+            .where(UserEntry.subscription_id == id, UserEntry.read.is_(True))
+        )
+        for row in stream(read):
+            yield dumps({"type": "read", "subscription": id, **row._asdict()})
+
+
+class Importer:
+    """
+    Applies archive records for a user, buffering entries and read state and
+    writing them a batch at a time
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.subscriptions: Dict[int, Subscription] = {}
+        self.entries: Dict[int, List[ParsedEntry]] = defaultdict(list)
+        self.read: Dict[int, List[ParsedEntry]] = defaultdict(list)
+        self.buffered = 0
+        self.counts: Counter = Counter()
+
+    def add(self, record: Dict[str, Any]):
+        kind = record.get("type")
+        if kind == "category":
+            get_or_create_category(self.user_id, record["name"])
+        elif kind == "subscription":
+            self.add_subscription(record)
+        elif kind == "entry":
+            self.entries[record["subscription"]].append(
+                ParsedEntry(
+                    title=record.get("title"),
+                    link=record.get("link"),
+                    published=parse_datetime(record.get("published")),
+                    updated=parse_datetime(record.get("updated")),
+                    summary=record.get("summary"),
+                    content=record.get("content"),
+                )
+            )
+            self.buffered += 1
+        elif kind == "read":
+            self.read[record["subscription"]].append(
+                ParsedEntry(
+                    title=record.get("title"),
+                    link=record["link"],
+                    published=parse_datetime(record.get("published")),
+                )
+            )
+            self.buffered += 1
+        else:
+            raise ValueError(f"unknown record type: {kind}")
+
+        # Read marks are counted once they've been applied, see flush
+        if kind != "read":
+            self.counts[kind] += 1
+        if self.buffered >= BATCH_SIZE:
+            self.flush()
+
+    def add_subscription(self, record: Dict[str, Any]):
+        feed = db.session.scalar(
+            select(Feed).where(Feed.feed_link == record["feed_link"])
+        )
+        if feed is None:
+            feed = Feed(
+                title=record.get("title"),
+                site_link=record.get("site_link"),
+                feed_link=record["feed_link"],
+                # Never been fetched here, so it's due a refresh straight away
+                refreshed_at=dt.datetime.min,
+            )
+            db.session.add(feed)
+            db.session.flush()
+
+        subscription = db.session.scalar(
+            select(Subscription).where(
+                Subscription.user_id == self.user_id, Subscription.feed_id == feed.id
+            )
+        )
+        if subscription is None:
+            category = None
+            if record.get("category") is not None:
+                category = get_or_create_category(self.user_id, record["category"])
+            subscription = subscribe(self.user_id, feed, category)
+
+        self.subscriptions[record["id"]] = subscription
+
+    def store_entries(self, subscription: Subscription, entries: List[ParsedEntry]):
+        """
+        Insert the entries the feed doesn't have yet, with user entries for
+        the importing user only. Other subscribers of the feed never saw
+        them, so they shouldn't turn up as unread for them
+        """
+        feed = subscription.feed
+        entry_ids = insert_entries(
+            feed.id, unseen_entries(feed.id, entries), base_url=feed.base_url
+        )
+        insert_user_entries(self.user_id, subscription.id, entry_ids)
+
+    def flush(self):
+        # Entries first, the read state may refer to them
+        for id, entries in self.entries.items():
+            self.store_entries(self.subscriptions[id], entries)
+
+        for id, entries in self.read.items():
+            subscription = self.subscriptions[id]
+            # Create any read entries this database hasn't seen yet
+            self.store_entries(subscription, entries)
+            links = [entry.link for entry in entries]
+            result = db.session.execute(
+                update(UserEntry)
+                .where(
+                    UserEntry.subscription_id == subscription.id,
+                    UserEntry.entry_id.in_(
+                        select(Entry.id).where(
+                            Entry.feed_id == subscription.feed_id,
+                            Entry.link.in_(links),
+                        )
+                    ),
+                )
+                .values(read=True)
+                .execution_options(synchronize_session=False)
+            )
+            self.counts["read"] += result.rowcount
+
+        db.session.commit()
+        self.entries.clear()
+        self.read.clear()
+        self.buffered = 0
+
+
+def import_user(user_id: int, lines: Iterable[str]) -> Dict[str, int]:
+    lines = (line for line in lines if line.strip())
+    header = json.loads(next(lines, "{}"))
+    if header.get("type") != "feeder":
+        raise ValueError("not a feeder export")
+    if header.get("version") != VERSION:
+        raise ValueError(f"unsupported export version: {header.get('version')}")
+
+    importer = Importer(user_id)
+    for line in lines:
+        importer.add(json.loads(line))
+    importer.flush()
+    return dict(importer.counts)
+
+
+def export_view(user_id: int):
+    if db.session.get(User, user_id) is None:
+        abort(404)
+    entries = request.args.get("entries", "").lower() in {"1", "true", "yes"}
+    return Response(
+        stream_with_context(export_user(user_id, entries=entries)),
+        mimetype="application/x-ndjson",
+        headers={
+            "Content-Disposition": f"attachment; filename=feeder-{user_id}.ndjson"
+        },
+    )
+
+
+def import_view(user_id: int):
+    if db.session.get(User, user_id) is None:
+        abort(404)
+    lines = io.TextIOWrapper(request.stream, encoding="utf-8")
+    try:
+        return import_user(user_id, lines)
+    except (ValueError, KeyError) as error:
+        db.session.rollback()
+        return {"error": str(error)}, 400
+
+
+@click.command("export")
+@click.argument("user_id", type=int)
+@click.argument("output", type=click.File("w"), default="-")
+@click.option("--entries", is_flag=True, help="Include every entry of each feed")
+@with_appcontext
+def export_command(user_id, output, entries):
+    """Export a user's categories, subscriptions and read state"""
+    if db.session.get(User, user_id) is None:
+        raise click.ClickException(f"no user with id {user_id}")
+    output.writelines(export_user(user_id, entries=entries))
+
+
+@click.command("import")
+@click.argument("user_id", type=int)
+@click.argument("archive", type=click.File("r"), default="-")
+@with_appcontext
+def import_command(user_id, archive):
+    """Import an archive made by the export command into a user"""
+    if db.session.get(User, user_id) is None:
+        raise click.ClickException(f"no user with id {user_id}")
+    try:
+        counts = import_user(user_id, archive)
+    except (ValueError, KeyError) as error:
+        raise click.ClickException(str(error))
+    for kind, count in counts.items():
+        click.echo(f"{kind}: {count}")
@@ -0,0 +1,96 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Table, insert, select
+
+from .content import process_entry
+from .db import db
+from .models import Entry, UserEntry
+from .parser import Entry as ParsedEntry
+
+# The lowest SQLITE_MAX_VARIABLE_NUMBER a build can ship with (anything older
+# than 3.32.0), every bound parameter in a multi row INSERT counts towards it
+SQLITE_MAX_VARIABLES = 999
+
+
+def chunked(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def bulk_insert(table: Table, rows: Iterable[Dict[str, Any]]) -> List[int]:
+    """
+    Insert rows with Core executemany, bypassing the ORM unit of work, and
+    return the new primary keys in the same order as rows.
+
+    rows is consumed a chunk at a time, so a generator only ever has one
+    chunk of dicts alive
+    """
+    chunk_size = max(1, SQLITE_MAX_VARIABLES // len(table.columns))
+    statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+
+    ids = []
+    for chunk in chunked(rows, chunk_size):
+        ids.extend(db.session.scalars(statement, chunk))
+    return ids
+
+
+def entry_row(
+    feed_id: int, entry: ParsedEntry, base_url: Optional[str]
+) -> Dict[str, Any]:
+    row = process_entry(Entry.normalise(feed_id=feed_id, **entry.as_dict()), base_url)
+    # RSS 2.0 items only need a title or a description, but entry.title is
+    # NOT NULL
+    if not row["title"]:
+        row["title"] = row["excerpt"] or row["link"]
+    return row
+
+
+def insert_entries(
+    feed_id: int, entries: Iterable[ParsedEntry], base_url: Optional[str] = None
+) -> List[int]:
+    return bulk_insert(
+        Entry.__table__, (entry_row(feed_id, entry, base_url) for entry in entries)
+    )
+
+
+def unseen_entries(feed_id: int, entries: List[ParsedEntry]) -> Iterator[ParsedEntry]:
+    """
+    Drop the entries the feed already has, going by link, along with repeats
+    within entries and entries without a link, which can't be told apart
+    """
+    links = {entry.link for entry in entries if entry.link is not None}
+    seen = set()
+    # One bound parameter per link, plus one for the feed id
+    for chunk in chunked(links, SQLITE_MAX_VARIABLES - 1):
+        seen.update(
+            db.session.scalars(
+                select(Entry.link).where(
+                    Entry.feed_id == feed_id, Entry.link.in_(chunk)
+                )
+            )
+        )
+
+    for entry in entries:
+        if entry.link is None or entry.link in seen:
+            continue
+        seen.add(entry.link)
+        yield entry
+
+
+def insert_user_entries(
+    user_id: int, subscription_id: int, entry_ids: Iterable[int]
+) -> List[int]:
+    return bulk_insert(
+        UserEntry.__table__,
+        (
+            {
+                "user_id": user_id,
+                "subscription_id": subscription_id,
+                "entry_id": entry_id,
+                "read": False,
+            }
+            for entry_id in entry_ids
+        ),
+    )
@@ -0,0 +1,248 @@
+import math
+from html import escape
+from html.parser import HTMLParser
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+ALLOWED_TAGS = {
+    "a",
+    "abbr",
+    "b",
+    "blockquote",
+    "br",
+    "cite",
+    "code",
+    "dd",
+    "del",
+    "div",
+    "dl",
+    "dt",
+    "em",
+    "figcaption",
+    "figure",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "hr",
+    "i",
+    "img",
+    "ins",
+    "li",
+    "mark",
+    "ol",
+    "p",
+    "pre",
+    "q",
+    "s",
+    "small",
+    "span",
+    "strong",
+    "sub",
+    "sup",
+    "table",
+    "tbody",
+    "td",
+    "th",
+    "thead",
+    "tr",
+    "u",
+    "ul",
+}
+
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "abbr": {"title"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan"},
+}
+
+URL_ATTRIBUTES = {"href", "src"}
+ALLOWED_SCHEMES = {"http", "https", "mailto"}
+
+# Tags dropped along with everything inside them
+DROPPED_TAGS = {
+    "embed",
+    "iframe",
+    "noscript",
+    "object",
+    "script",
+    "style",
+    "svg",
+    "template",
+    "title",
+}
+
+VOID_TAGS = {"br", "hr", "img"}
+
+# Tags which don't break up words when flattened to plain text
+INLINE_TAGS = {
+    "a",
+    "abbr",
+    "b",
+    "cite",
+    "code",
+    "del",
+    "em",
+    "i",
+    "ins",
+    "mark",
+    "q",
+    "s",
+    "small",
+    "span",
+    "strong",
+    "sub",
+    "sup",
+    "u",
+}
+
+EXCERPT_LENGTH = 280
+WORDS_PER_MINUTE = 200
+
+
+class Content(NamedTuple):
+    html: str
+    text: str
+
+
+class Sanitiser(HTMLParser):
+    """
+    Rebuilds the markup from an allow list of tags and attributes, resolving
+    relative links against base_url, while collecting the plain text
+    """
+
+    def __init__(self, base_url: Optional[str] = None):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.html: List[str] = []
+        self.text: List[str] = []
+        self.open_tags: List[str] = []
+        self.dropping: List[str] = []
+
+    def resolve(self, url: str) -> Optional[str]:
+        url = url.strip()
+        if self.base_url:
+            url = urljoin(self.base_url, url)
+        scheme = urlparse(url).scheme
+        if scheme and scheme not in ALLOWED_SCHEMES:
+            return None
+        return url
+
+    def sanitise_attrs(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> str:
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        sanitised = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES:
+                value = self.resolve(value)
+                if value is None:
+                    continue
+            sanitised.append(f' {name}="{escape(value)}"')
+        return "".join(sanitised)
+
+    def handle_starttag(self, tag, attrs):
+        if self.dropping or tag in DROPPED_TAGS:
+            if tag not in VOID_TAGS:
+                self.dropping.append(tag)
+            return
+
+        if tag not in INLINE_TAGS:
+            self.text.append(" ")
+
+        if tag not in ALLOWED_TAGS:
+            return
+
+        self.html.append(f"<{tag}{self.sanitise_attrs(tag, attrs)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.dropping:
+            if tag in self.dropping:
+                del self.dropping[self.dropping.index(tag) :]
+            return
+
+        if tag not in INLINE_TAGS:
+            self.text.append(" ")
+
+        if tag not in self.open_tags:
+            return
+
+        # Close anything left open inside this tag, so the output stays
+        # balanced however broken the input is
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self) -> Content:
+        super().close()
+        while self.open_tags:
+            self.html.append(f"</{self.open_tags.pop()}>")
+        return Content(
+            html="".join(self.html),
+            text=" ".join("".join(self.text).split()),
+        )
+
+
+def sanitise(html: str, base_url: Optional[str] = None) -> Content:
+    sanitiser = Sanitiser(base_url)
+    sanitiser.feed(html)
+    return sanitiser.close()
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    if len(text) <= length:
+        return text
+    # Cut on the last word boundary that fits, unless it's one enormous word
+    cut = text[: length + 1].rsplit(" ", 1)[0]
+    if len(cut) > length:
+        cut = text[:length]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def reading_time(word_count: int) -> int:
+    """Minutes, rounded up"""
+    return math.ceil(word_count / WORDS_PER_MINUTE)
+
+
+def process_entry(entry: Dict[str, Any], base_url: Optional[str]) -> Dict[str, Any]:
+    """
+    Ingestion stage run once on each entry before it's stored, so clients
+    get safe markup and list views can skip the full content
+    """
+    summary = entry.get("summary")
+    if summary is not None:
+        entry["summary"] = sanitise(summary, base_url).html
+
+    content = entry.get("content")
+    if content is None:
+        entry.update(excerpt=None, word_count=None, reading_time=None)
+        return entry
+
+    content = sanitise(content, base_url)
+    word_count = len(content.text.split())
+    entry.update(
+        content=content.html,
+        excerpt=make_excerpt(content.text),
+        word_count=word_count,
+        reading_time=reading_time(word_count),
+    )
+    return entry
@@ -2,7 +2,15 @@ import datetime as dt
 from typing import List
 from urllib.parse import urlparse
 
-from sqlalchemy import DateTime, ForeignKey, String, UniqueConstraint, func, select
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    UniqueConstraint,
+    func,
+    select,
+)
 from sqlalchemy.orm import (
     Mapped,
     column_property,
@@ -25,6 +33,8 @@ class User(db.Model):
 
 
 class Category(db.Model):
+    __table_args__ = (Index("ix_category_user_id_name", "user_id", "name"),)
+
     id: Mapped[int] = mapped_column(primary_key=True)
 
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
@@ -50,10 +60,12 @@ class Subscription(db.Model):
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
     user: Mapped["User"] = relationship(back_populates="subscriptions")
 
-    category_id: Mapped[int] = mapped_column(ForeignKey("category.id"))
+    category_id: Mapped[int] = mapped_column(ForeignKey("category.id"), index=True)
     category: Mapped["Category"] = relationship(back_populates="subscriptions")
 
-    feed_id: Mapped[int] = mapped_column(ForeignKey("feed.id"), nullable=False)
+    feed_id: Mapped[int] = mapped_column(
+        ForeignKey("feed.id"), nullable=False, index=True
+    )
     feed: Mapped["Feed"] = relationship(back_populates="subscribers")
 
     entries: Mapped[List["UserEntry"]] = relationship(
@@ -62,15 +74,21 @@ class Subscription(db.Model):
 
 
 class UserEntry(db.Model):
+    # subscription_id is covered by the leading column of the composite index,
+    # which also serves the unread_count subquery
+    __table_args__ = (
+        Index("ix_user_entry_subscription_id_read", "subscription_id", "read"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
 
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), index=True)
     user: Mapped["User"] = relationship(back_populates="entries")
 
     subscription_id: Mapped[int] = mapped_column(ForeignKey("subscription.id"))
     subscription: Mapped["Subscription"] = relationship(back_populates="entries")
 
-    entry_id: Mapped[int] = mapped_column(ForeignKey("entry.id"))
+    entry_id: Mapped[int] = mapped_column(ForeignKey("entry.id"), index=True)
     entry: Mapped["Entry"] = relationship()
 
     read: Mapped[bool]
@@ -85,6 +103,11 @@ class Feed(db.Model):
     feed_link: Mapped[str]
     site_link: Mapped[str]
 
+    # When a worker last tried to refresh the feed, see feeder.worker
+    refreshed_at: Mapped[dt.datetime] = mapped_column(
+        DateTime, nullable=True, index=True, default=dt.datetime.utcnow
+    )
+
     entries: Mapped[List["Entry"]] = relationship(back_populates="feed")
     subscribers: Mapped[List["Subscription"]] = relationship(back_populates="feed")
 
@@ -99,13 +122,43 @@ class Feed(db.Model):
             title=title, site_link=site_link, feed_link=feed_link, **kwargs
         )
 
+    @property
+    def base_url(self) -> str:
+        """
+        What relative links in entries resolve against. The site_link
+        fallback above is a bare host, which urljoin would ignore
+        """
+        if urlparse(self.site_link).scheme:
+            return self.site_link
+        return self.feed_link
+
+
+class FeedLease(db.Model):
+    """A worker's claim on refreshing a feed, which lapses at expires_at"""
+
+    feed_id: Mapped[int] = mapped_column(ForeignKey("feed.id"), primary_key=True)
+    worker: Mapped[str]
+    expires_at: Mapped[dt.datetime] = mapped_column(DateTime)
+
 
 class Entry(db.Model):
+    # feed_id is covered by the leading column of the composite index
+    __table_args__ = (Index("ix_entry_feed_id_published", "feed_id", "published"),)
+
     id: Mapped[int] = mapped_column(primary_key=True)
     link: Mapped[str]
     title: Mapped[str]
-    content: Mapped[str] = mapped_column(String, nullable=True)
-    summary: Mapped[str] = mapped_column(String, nullable=True)
+    # The bodies are deferred so list views selecting excerpts don't load them
+    content: Mapped[str] = mapped_column(
+        String, nullable=True, deferred=True, deferred_group="body"
+    )
+    summary: Mapped[str] = mapped_column(
+        String, nullable=True, deferred=True, deferred_group="body"
+    )
+
+    excerpt: Mapped[str] = mapped_column(String, nullable=True)
+    word_count: Mapped[int] = mapped_column(nullable=True)
+    reading_time: Mapped[int] = mapped_column(nullable=True)
 
     feed_id: Mapped[int] = mapped_column(ForeignKey("feed.id"))
     feed: Mapped["Feed"] = relationship(back_populates="entries")
@@ -113,8 +166,11 @@ class Entry(db.Model):
     published: Mapped[dt.datetime] = mapped_column(DateTime, nullable=True)
     updated: Mapped[dt.datetime] = mapped_column(DateTime, nullable=True)
 
-    def __init__(
-        self,
+    def __init__(self, **kwargs):
+        super().__init__(**self.normalise(**kwargs))
+
+    @staticmethod
+    def normalise(
         title=None,
         content=None,
         summary=None,
@@ -122,13 +178,17 @@ class Entry(db.Model):
         updated=None,
         **kwargs
     ):
+        """
+        Fill in missing fields from their fallbacks, shared by the ORM
+        constructor and the bulk insert path (which skips __init__)
+        """
         if content is None and summary is not None:
             content = summary
 
         if published is None and updated is not None:
             published = updated
 
-        super().__init__(
+        return dict(
             title=title,
             content=content,
             summary=summary,
@@ -141,7 +201,7 @@ class Entry(db.Model):
 Subscription.unread_count = column_property(
     select(func.count(UserEntry.id))
     .where(UserEntry.subscription_id == Subscription.id)
-    .where(UserEntry.read is False)
+    .where(UserEntry.read.is_(False))
     .correlate_except(UserEntry)
     .scalar_subquery()
 )
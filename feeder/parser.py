@@ -1,4 +1,5 @@
 import datetime as dt
+import sys
 from abc import abstractmethod
 from typing import Any, Dict, List, Optional, Protocol, Tuple, TypedDict
 
@@ -11,12 +12,67 @@ class Feed(TypedDict):
     feed_link: Optional[str]
 
 
-class Entry(TypedDict):
-    title: Optional[str]
-    link: Optional[str]
-    published: Optional[dt.datetime]
-    summary: Optional[str]
-    content: Optional[str]
+class Entry:
+    """
+    Slotted rather than a dict, refresh workers hold thousands of these.
+    Links are split so the prefix every entry in a feed shares is only
+    stored once
+    """
+
+    __slots__ = (
+        "title",
+        "link_prefix",
+        "link_suffix",
+        "published",
+        "updated",
+        "summary",
+        "content",
+    )
+
+    def __init__(
+        self,
+        title: Optional[str] = None,
+        link: Optional[str] = None,
+        published: Optional[dt.datetime] = None,
+        updated: Optional[dt.datetime] = None,
+        summary: Optional[str] = None,
+        content: Optional[str] = None,
+    ):
+        self.title = title
+        self.link = link
+        self.published = published
+        self.updated = updated
+        self.summary = summary
+        self.content = content
+
+    @property
+    def link(self) -> Optional[str]:
+        if self.link_suffix is None:
+            return None
+        return self.link_prefix + self.link_suffix
+
+    @link.setter
+    def link(self, value: Optional[str]):
+        if value is None:
+            self.link_prefix, self.link_suffix = "", None
+        else:
+            prefix, sep, self.link_suffix = value.rpartition("/")
+            self.link_prefix = sys.intern(prefix + sep)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "link": self.link,
+            "published": self.published,
+            "updated": self.updated,
+            "summary": self.summary,
+            "content": self.content,
+        }
+
+
+def intern(value: Optional[str]) -> Optional[str]:
+    """Share one copy of strings that repeat across refreshes"""
+    return sys.intern(value) if isinstance(value, str) else value
 
 
 def make_parser(data):
@@ -63,22 +119,24 @@ class RSSParser(Parser):
     def __init__(self, data):
         self.data = data
 
-    def parse_entry(self, data: Dict[str, Any]):
+    def parse_entry(self, data: Dict[str, Any]) -> Entry:
         published = data.get("pubDate")
 
-        return {
-            "title": data.get("title"),
-            "link": data.get("link"),
-            "published": dateutil.parser.parse(published) if published else None,
-            "summary": data.get("description"),
-            "content": self.parse_text(data.get("content") or data.get("content:encoded")),
-        }
+        return Entry(
+            title=data.get("title"),
+            link=data.get("link"),
+            published=dateutil.parser.parse(published) if published else None,
+            summary=data.get("description"),
+            content=self.parse_text(
+                data.get("content") or data.get("content:encoded")
+            ),
+        )
 
     def parse(self) -> Tuple[Feed, List[Entry]]:
         channel = self.data["rss"]["channel"]
         return {
-            "title": channel.get("title"),
-            "site_link": channel.get("link"),
+            "title": intern(channel.get("title")),
+            "site_link": intern(channel.get("link")),
             "feed_link": None,
         }, self.parse_entries(channel.get("item"))
 
@@ -123,7 +181,6 @@ class AtomParser(Parser):
             return value
 
         if isinstance(value, str):
-            breakpoint()
             return value
 
         elif isinstance(value, list):
@@ -141,28 +198,28 @@ class AtomParser(Parser):
             if href:
                 return href
 
-        breakpoint()
+        return None
 
-    def parse_entry(self, data):
+    def parse_entry(self, data) -> Entry:
         published = data.get("published")
         updated = data.get("updated")
         content = data.get("content")
         summary = data.get("summary")
 
-        return {
-            "title": self.parse_text(data.get("title")),
-            "link": self.parse_link(data.get("link")),
-            "summary": self.parse_text(summary) if summary else None,
-            "content": self.parse_text(content) if content else None,
-            "published": dateutil.parser.parse(published) if published else None,
-            "updated": dateutil.parser.parse(updated) if updated else None,
-        }
+        return Entry(
+            title=self.parse_text(data.get("title")),
+            link=self.parse_link(data.get("link")),
+            summary=self.parse_text(summary) if summary else None,
+            content=self.parse_text(content) if content else None,
+            published=dateutil.parser.parse(published) if published else None,
+            updated=dateutil.parser.parse(updated) if updated else None,
+        )
 
     def parse(self) -> Tuple[Feed, List[Entry]]:
         feed = self.data["feed"]
         site_link, feed_link = self.parse_links(feed["link"])
         return {
-            "title": self.parse_text(feed.get("title")),
-            "site_link": site_link,
+            "title": intern(self.parse_text(feed.get("title"))),
+            "site_link": intern(site_link),
             "feed_link": feed_link,
         }, self.parse_entries(feed.get("entry"))
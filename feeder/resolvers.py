@@ -1,16 +1,17 @@
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import httpx
 import strawberry
 import xmltodict
 from sqlalchemy import select, update
 
+from .bulk import insert_entries, insert_user_entries, unseen_entries
 from .db import db
 from .models import Category, Entry, Feed, Subscription, User, UserEntry
+from .parser import Entry as ParsedEntry
+from .parser import Feed as ParsedFeed
 from .parser import make_parser
 
-# TODO logic + async workers to update feeds
-
 
 async def get_user(id: strawberry.ID):
     return db.session.get(User, id)
@@ -96,32 +97,42 @@ async def add_subscription(
     category_record = None
 
     if category is not None and category is not strawberry.UNSET:
-        category_record = db.session.scalar(
-            select(Category).where(
-                Category.name == category, Category.user_id == user_id
-            )
-        )
-        if category_record is None:
-            category_record = Category(name=category, user_id=user_id)
+        category_record = get_or_create_category(user_id, category)
 
-    subscription = Subscription(user_id=user_id, feed=feed, category=category_record)
+    subscription = subscribe(user_id, feed, category_record)
+    db.session.commit()
+    return subscription
 
-    for entry in feed.entries:
-        db.session.add(
-            UserEntry(
-                user_id=user_id, entry=entry, read=False, subscription=subscription
-            )
-        )
 
+def get_or_create_category(user_id: int, name: str) -> Category:
+    category = db.session.scalar(
+        select(Category).where(Category.name == name, Category.user_id == user_id)
+    )
+    if category is None:
+        category = Category(name=name, user_id=user_id)
+        db.session.add(category)
+    return category
+
+
+def subscribe(user_id: int, feed: Feed, category: Optional[Category]) -> Subscription:
+    """
+    Subscribe the user to the feed, with an unread user entry for every entry
+    the feed already has
+    """
+    subscription = Subscription(user_id=user_id, feed=feed, category=category)
     db.session.add(subscription)
-    db.session.commit()
+    db.session.flush()
+
+    entry_ids = db.session.scalars(
+        select(Entry.id).where(Entry.feed_id == feed.id)
+    ).all()
+    insert_user_entries(user_id, subscription.id, entry_ids)
     return subscription
 
 
 async def add_feed(url: str) -> Optional[Feed]:
     feed = await fetch_feed(url)
     if feed is not None:
-        db.session.add(feed)
         db.session.commit()
     return feed
 
@@ -129,12 +140,7 @@ async def add_feed(url: str) -> Optional[Feed]:
 USER_AGENT = "feeder/1 +https://github.com/Jackevansevo/feeder/"
 
 
-async def fetch_feed(url: str) -> Optional[Feed]:
-    # Check if the feed already exists
-    existing_feed = db.session.scalar(select(Feed).where(Feed.feed_link == url))
-    if existing_feed:
-        return existing_feed
-
+async def fetch(url: str) -> Tuple[Optional[ParsedFeed], List[ParsedEntry]]:
     async with httpx.AsyncClient(
         follow_redirects=True, headers={"User-Agent": USER_AGENT}
     ) as client:
@@ -149,13 +155,30 @@ async def fetch_feed(url: str) -> Optional[Feed]:
 
     parsed_feed, entries = parser.parse()
     if parsed_feed is None:
-        return
+        return None, []
 
     feed_link = parsed_feed.get("feed_link")
     if feed_link is None:
         parsed_feed["feed_link"] = str(resp.url)
 
-    feed = Feed(entries=[Entry(**entry) for entry in entries], **parsed_feed)
+    return parsed_feed, entries
+
+
+async def fetch_feed(url: str) -> Optional[Feed]:
+    # Check if the feed already exists
+    existing_feed = db.session.scalar(select(Feed).where(Feed.feed_link == url))
+    if existing_feed:
+        return existing_feed
+
+    parsed_feed, entries = await fetch(url)
+    if parsed_feed is None:
+        return
+
+    feed = Feed(**parsed_feed)
+    db.session.add(feed)
+    db.session.flush()
+
+    insert_entries(feed.id, unseen_entries(feed.id, entries), base_url=feed.base_url)
     return feed
 
 
@@ -94,6 +94,10 @@ class Entry:
     content: Optional[str]
     summary: Optional[str]
 
+    excerpt: Optional[str]
+    word_count: Optional[int]
+    reading_time: Optional[int]
+
     feed_id: Optional[int]
     feed: Optional[Feed]
 
@@ -0,0 +1,186 @@
+"""
+Background refresh workers. Any number of them can run against the same
+database, each one claims a batch of due feeds by taking a lease on them, so
+no feed is fetched by two workers at once. A lease that isn't released
+(because its worker died) lapses at expires_at and the feed is up for grabs
+again.
+"""
+
+import asyncio
+import datetime as dt
+import logging
+import os
+import socket
+from typing import List, Optional
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .bulk import insert_entries, insert_user_entries, unseen_entries
+from .db import db
+from .models import Feed, FeedLease, Subscription
+from .parser import Entry as ParsedEntry
+from .resolvers import fetch
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = dt.timedelta(minutes=30)
+LEASE_DURATION = dt.timedelta(minutes=5)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def upsert(table):
+    if db.engine.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def claim_feeds(
+    worker: str,
+    batch_size: int,
+    lease_duration: dt.timedelta = LEASE_DURATION,
+    refresh_interval: dt.timedelta = REFRESH_INTERVAL,
+    now: Optional[dt.datetime] = None,
+) -> List[int]:
+    """
+    Lease up to batch_size of the feeds which are due a refresh and which
+    nobody else holds a live lease on, returning their ids.
+
+    The claim is a single INSERT ... SELECT ... ON CONFLICT statement. On
+    Postgres the SELECT locks the feeds with SKIP LOCKED, so concurrent
+    workers pass over each other's batches instead of queueing behind them,
+    on SQLite the database lock serialises claims. Either way the conflict
+    clause only takes over leases which have expired.
+    """
+    now = now or dt.datetime.utcnow()
+
+    due = (
+        select(Feed.id, literal(worker), literal(now + lease_duration))
+        .outerjoin(FeedLease)
+        .where(
+            or_(
+                Feed.refreshed_at.is_(None),
+                Feed.refreshed_at < now - refresh_interval,
+            ),
+            or_(FeedLease.expires_at.is_(None), FeedLease.expires_at < now),
+        )
+        .order_by(Feed.refreshed_at.nulls_first())
+        .limit(batch_size)
+        .with_for_update(of=Feed, skip_locked=True)
+    )
+
+    statement = upsert(FeedLease).from_select(
+        [FeedLease.feed_id, FeedLease.worker, FeedLease.expires_at], due
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[FeedLease.feed_id],
+        set_={
+            "worker": statement.excluded.worker,
+            "expires_at": statement.excluded.expires_at,
+        },
+        where=FeedLease.expires_at < now,
+    ).returning(FeedLease.feed_id)
+
+    return db.session.scalars(statement).all()
+
+
+def release_feeds(worker: str, feed_ids: List[int], now: Optional[dt.datetime] = None):
+    """Mark the feeds as refreshed and give up the worker's leases on them"""
+    now = now or dt.datetime.utcnow()
+    db.session.execute(
+        update(Feed).where(Feed.id.in_(feed_ids)).values(refreshed_at=now)
+    )
+    db.session.execute(
+        delete(FeedLease).where(
+            FeedLease.worker == worker, FeedLease.feed_id.in_(feed_ids)
+        )
+    )
+
+
+def store_new_entries(feed: Feed, entries: List[ParsedEntry]) -> List[int]:
+    """
+    Insert the entries that haven't been seen before, and give every
+    subscriber of the feed a user entry for each of them
+    """
+    entry_ids = insert_entries(
+        feed.id, unseen_entries(feed.id, entries), base_url=feed.base_url
+    )
+
+    if entry_ids:
+        subscribers = db.session.execute(
+            select(Subscription.id, Subscription.user_id).where(
+                Subscription.feed_id == feed.id
+            )
+        )
+        for subscription_id, user_id in subscribers.all():
+            insert_user_entries(user_id, subscription_id, entry_ids)
+
+    return entry_ids
+
+
+async def refresh_feeds(feeds: List[Feed]):
+    # Download concurrently, the database writes happen one feed at a time
+    results = await asyncio.gather(
+        *(fetch(feed.feed_link) for feed in feeds), return_exceptions=True
+    )
+    for feed, result in zip(feeds, results):
+        if isinstance(result, Exception):
+            logger.warning("Failed to refresh %s: %r", feed.feed_link, result)
+            continue
+        _, entries = result
+        # A feed that can't be stored only loses its own entries, not the
+        # rest of the batch
+        try:
+            with db.session.begin_nested():
+                store_new_entries(feed, entries)
+        except Exception:
+            logger.exception("Failed to store entries for %s", feed.feed_link)
+
+
+async def run_worker(
+    worker: str,
+    batch_size: int = 10,
+    lease_duration: dt.timedelta = LEASE_DURATION,
+    poll_interval: float = 30,
+    once: bool = False,
+):
+    """Refresh batches of due feeds until stopped, or there are none left"""
+    while True:
+        feed_ids = claim_feeds(worker, batch_size, lease_duration)
+        # Commit straight away so other workers can see the leases
+        db.session.commit()
+
+        if feed_ids:
+            feeds = db.session.scalars(select(Feed).where(Feed.id.in_(feed_ids)))
+            await refresh_feeds(feeds.all())
+            release_feeds(worker, feed_ids)
+            db.session.commit()
+            logger.info("%s refreshed %d feeds", worker, len(feed_ids))
+        elif once:
+            return
+        else:
+            await asyncio.sleep(poll_interval)
+
+
+@click.command("refresh")
+@click.option("--batch-size", default=10, help="Feeds to claim at a time")
+@click.option("--lease", default=300, help="Seconds before an unreleased claim lapses")
+@click.option("--poll-interval", default=30.0, help="Seconds to wait when idle")
+@click.option("--once", is_flag=True, help="Exit once no feeds are due")
+@with_appcontext
+def refresh_command(batch_size, lease, poll_interval, once):
+    """Run a background worker refreshing due feeds"""
+    asyncio.run(
+        run_worker(
+            worker_name(),
+            batch_size=batch_size,
+            lease_duration=dt.timedelta(seconds=lease),
+            poll_interval=poll_interval,
+            once=once,
+        )
+    )
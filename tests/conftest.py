@@ -0,0 +1,79 @@
+from functools import partial
+
+import httpx
+import pytest
+
+from feeder import create_app, resolvers
+from feeder.db import db
+from feeder.models import Category, Feed, Subscription
+
+
+@pytest.fixture()
+def app():
+    app = create_app(db_uri="sqlite://")
+    app.config.update(
+        {
+            "TESTING": True,
+        }
+    )
+
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture()
+def runner(app):
+    return app.test_cli_runner()
+
+
+@pytest.fixture()
+def serve_feeds(monkeypatch):
+    """
+    Answer the requests fetch makes with respond, either the body of every
+    response or a function from the request to the response
+    """
+
+    def serve(respond):
+        if isinstance(respond, str):
+            content = respond
+
+            def respond(request):
+                return httpx.Response(200, text=content)
+
+        transport = httpx.MockTransport(respond)
+        monkeypatch.setattr(
+            resolvers.httpx,
+            "AsyncClient",
+            partial(httpx.AsyncClient, transport=transport),
+        )
+
+    return serve
+
+
+@pytest.fixture()
+def subscription(app):
+    """User 1 subscribed to a feed without any entries, filed under news"""
+    feed = Feed(
+        title="Example",
+        site_link="https://example.com",
+        feed_link="https://example.com/feed.xml",
+    )
+    subscription = Subscription(
+        user_id=1, feed=feed, category=Category(name="news", user_id=1)
+    )
+    db.session.add(subscription)
+    db.session.commit()
+    return subscription
+
+
+def graphql(client, query, variables={}):
+    return client.post(
+        "/graphql",
+        json={"query": query, "variables": variables},
+        headers={"Content-Type": "application/json"},
+    )
@@ -0,0 +1,188 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from feeder import create_app
+from feeder.archive import export_user, import_user
+from feeder.db import db
+from feeder.models import Category, Entry, Subscription, User, UserEntry
+from feeder.resolvers import subscribe
+
+
+def read_state(user_id):
+    return dict(
+        db.session.execute(
+            select(Entry.link, UserEntry.read)
+            .join(UserEntry)
+            .where(UserEntry.user_id == user_id)
+        ).all()
+    )
+
+
+@pytest.fixture()
+def subscription(subscription):
+    for i in range(4):
+        entry = Entry(
+            title=f"Entry {i}",
+            link=f"https://example.com/{i}",
+            content="<p>hi</p>",
+            feed=subscription.feed,
+        )
+        subscription.entries.append(UserEntry(user_id=1, entry=entry, read=i % 2 == 0))
+    db.session.add(User(email="other@example.com", password=""))
+    db.session.commit()
+    return subscription
+
+
+def test_export_user(subscription):
+    records = [json.loads(line) for line in export_user(1)]
+
+    assert records[0] == {"type": "feeder", "version": 1}
+    assert {"type": "category", "name": "news"} in records
+    assert [record["type"] for record in records].count("subscription") == 1
+    assert "entry" not in {record["type"] for record in records}
+    assert sorted(record["link"] for record in records if record["type"] == "read") == [
+        "https://example.com/0",
+        "https://example.com/2",
+    ]
+
+
+def test_import_into_another_user(subscription):
+    counts = import_user(2, export_user(1))
+
+    assert counts == {"category": 1, "subscription": 1, "read": 2}
+    assert read_state(2) == read_state(1)
+    assert db.session.scalar(select(Category.name).where(Category.user_id == 2)) == (
+        "news"
+    )
+
+
+def test_import_empty_category(subscription):
+    db.session.add(Category(name="empty", user_id=1))
+    db.session.commit()
+
+    counts = import_user(2, export_user(1))
+
+    assert counts["category"] == 2
+    names = db.session.scalars(select(Category.name).where(Category.user_id == 2))
+    assert sorted(names) == ["empty", "news"]
+
+
+def test_import_is_idempotent(subscription):
+    archive = list(export_user(1))
+    import_user(2, archive)
+    import_user(2, archive)
+
+    assert len(read_state(2)) == 4
+    assert db.session.scalars(
+        select(Subscription.id).where(Subscription.user_id == 2)
+    ).all() == [2]
+
+
+def test_import_leaves_other_subscribers_alone(subscription):
+    other = subscribe(3, subscription.feed, Category(name="news", user_id=3))
+    db.session.commit()
+    archive = list(export_user(1, entries=True))
+    archive.append(
+        json.dumps(
+            {
+                "type": "entry",
+                "subscription": subscription.id,
+                "link": "https://example.com/old",
+                "title": "Old",
+            }
+        )
+    )
+    archive.append(
+        json.dumps(
+            {
+                "type": "read",
+                "subscription": subscription.id,
+                "link": "https://example.com/older",
+                "title": "Older",
+            }
+        )
+    )
+
+    import_user(2, archive)
+
+    assert len(read_state(2)) == 6
+    assert len(read_state(3)) == 4
+    assert other.unread_count == 4
+
+
+def test_import_into_new_database(subscription, tmp_path):
+    archive = list(export_user(1, entries=True))
+    expected = read_state(1)
+
+    other = create_app(db_uri=f"sqlite:///{tmp_path / 'other.db'}")
+    with other.app_context():
+        counts = import_user(1, archive)
+
+        assert counts["entry"] == 4
+        assert read_state(1) == expected
+        entry = db.session.scalar(
+            select(Entry).where(Entry.link == "https://example.com/0")
+        )
+        assert entry.content == "<p>hi</p>"
+        assert entry.excerpt == "hi"
+
+
+def test_import_read_state_without_entries_into_new_database(subscription, tmp_path):
+    archive = list(export_user(1))
+
+    other = create_app(db_uri=f"sqlite:///{tmp_path / 'other.db'}")
+    with other.app_context():
+        counts = import_user(1, archive)
+
+        assert counts["read"] == 2
+        # Only the read entries travel without --entries, and without content
+        assert read_state(1) == {
+            "https://example.com/0": True,
+            "https://example.com/2": True,
+        }
+        entry = db.session.scalar(
+            select(Entry).where(Entry.link == "https://example.com/0")
+        )
+        assert entry.title == "Entry 0"
+        assert entry.content is None
+
+
+@pytest.mark.parametrize(
+    "lines, error",
+    [
+        ([], "not a feeder export"),
+        (['{"type": "feeder", "version": 2}'], "unsupported export version: 2"),
+        (['{"type": "feeder", "version": 1}', '{"type": "nope"}'], "unknown record"),
+    ],
+)
+def test_import_rejects_bad_archives(app, lines, error):
+    with pytest.raises(ValueError, match=error):
+        import_user(1, lines)
+
+
+def test_export_and_import_endpoints(client, subscription):
+    response = client.get("/users/1/export?entries=1")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+
+    response = client.post("/users/2/import", data=response.data)
+    assert response.status_code == 200
+    assert response.json == {"category": 1, "subscription": 1, "entry": 4, "read": 2}
+    assert read_state(2) == read_state(1)
+
+    assert client.post("/users/2/import", data=b"nonsense").status_code == 400
+    assert client.get("/users/404/export").status_code == 404
+
+
+def test_export_and_import_commands(runner, subscription, tmp_path):
+    archive = tmp_path / "archive.ndjson"
+
+    result = runner.invoke(args=["export", "1", str(archive)])
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(args=["import", "2", str(archive)])
+    assert result.exit_code == 0, result.output
+    assert "read: 2" in result.output
+    assert read_state(2) == read_state(1)
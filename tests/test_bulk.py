@@ -0,0 +1,130 @@
+import asyncio
+import datetime as dt
+
+import pytest
+from sqlalchemy import func, select
+
+from feeder import resolvers
+from feeder.bulk import SQLITE_MAX_VARIABLES, insert_entries, insert_user_entries
+from feeder.db import db
+from feeder.models import Entry, Feed, UserEntry
+from feeder.parser import Entry as ParsedEntry
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0">
+  <channel>
+    <title>Example</title>
+    <link>https://example.com</link>
+    {items}
+  </channel>
+</rss>
+"""
+
+ITEM = """
+<item>
+  <title>Entry {i}</title>
+  <link>https://example.com/{i}</link>
+  <description>Summary {i}</description>
+  <pubDate>Mon, 03 Apr 2023 12:00:00 GMT</pubDate>
+</item>
+"""
+
+
+@pytest.fixture()
+def feed(app):
+    feed = Feed(title="test", feed_link="https://example.com/feed.xml")
+    db.session.add(feed)
+    db.session.flush()
+    return feed
+
+
+def test_insert_entries(feed):
+    entries = [
+        ParsedEntry(title=f"entry {i}", link=f"https://example.com/{i}", summary="s")
+        for i in range(SQLITE_MAX_VARIABLES)
+    ]
+
+    ids = insert_entries(feed.id, entries)
+
+    # Spans several chunks, and the ids come back in insertion order
+    assert len(ids) == len(entries)
+    titles = db.session.execute(select(Entry.id, Entry.title).where(Entry.id.in_(ids)))
+    assert dict(titles.all()) == {id: e.title for id, e in zip(ids, entries)}
+
+
+def test_insert_entries_normalises(feed):
+    updated = dt.datetime(2023, 4, 3)
+    [id] = insert_entries(
+        feed.id, [ParsedEntry(title="a", link="b", summary="s", updated=updated)]
+    )
+
+    entry = db.session.get(Entry, id)
+    assert entry.content == "s"
+    assert entry.published == updated
+
+
+def test_insert_entries_fills_missing_titles(feed):
+    ids = insert_entries(
+        feed.id,
+        [
+            ParsedEntry(link="https://example.com/1", summary="<p>Hello world</p>"),
+            ParsedEntry(link="https://example.com/2"),
+        ],
+    )
+
+    titles = db.session.scalars(select(Entry.title).where(Entry.id.in_(ids)))
+    assert titles.all() == ["Hello world", "https://example.com/2"]
+
+
+def test_insert_entries_empty(feed):
+    assert insert_entries(feed.id, []) == []
+
+
+def test_insert_user_entries(subscription):
+    entry_ids = insert_entries(
+        subscription.feed_id,
+        [ParsedEntry(title=str(i), link=str(i)) for i in range(10)],
+    )
+
+    ids = insert_user_entries(1, subscription.id, entry_ids)
+
+    user_entries = db.session.scalars(select(UserEntry).where(UserEntry.id.in_(ids)))
+    assert [ue.entry_id for ue in user_entries] == entry_ids
+    db.session.expire(subscription)
+    assert subscription.unread_count == 10
+
+
+def test_add_subscription_without_site_link(app, serve_feeds):
+    serve_feeds("""<?xml version="1.0"?>
+        <rss version="2.0"><channel><title>Example</title><item>
+          <title>Entry</title>
+          <link>https://example.com/blog/entry</link>
+          <description>&lt;a href="/about"&gt;About&lt;/a&gt;</description>
+        </item></channel></rss>""")
+
+    subscription = asyncio.run(
+        resolvers.add_subscription("https://example.com/blog/feed.xml", 1, "news")
+    )
+
+    assert subscription.feed.site_link == "example.com"
+    [entry] = subscription.feed.entries
+    assert entry.content == '<a href="https://example.com/about">About</a>'
+
+
+def test_add_subscription(app, serve_feeds):
+    serve_feeds(RSS.format(items="".join(ITEM.format(i=i) for i in range(500))))
+
+    subscription = asyncio.run(
+        resolvers.add_subscription("https://example.com/feed.xml", 1, "news")
+    )
+
+    assert len(subscription.feed.entries) == 500
+    assert subscription.feed.entries[0].content == "Summary 0"
+    assert (
+        db.session.scalar(
+            select(func.count(UserEntry.id)).where(
+                UserEntry.subscription_id == subscription.id
+            )
+        )
+        == 500
+    )
@@ -0,0 +1,87 @@
+from sqlalchemy import inspect
+
+from feeder.bulk import insert_entries
+from feeder.content import make_excerpt, process_entry, reading_time, sanitise
+from feeder.db import db
+from feeder.models import Entry, Feed
+from feeder.parser import Entry as ParsedEntry
+
+
+def test_sanitise_strips_unsafe_markup():
+    content = sanitise(
+        '<p onclick="steal()">Hello <script>alert(1)</script><b>world</b></p>'
+        '<a href="javascript:alert(1)">link</a><iframe src="x">frame</iframe>'
+    )
+    assert content.html == "<p>Hello <b>world</b></p><a>link</a>"
+    assert content.text == "Hello world link"
+
+
+def test_sanitise_resolves_relative_links():
+    content = sanitise(
+        '<a href="/posts/1">post</a><img src="image.png" alt="&quot;x&quot;">',
+        base_url="https://example.com/blog/",
+    )
+    assert content.html == (
+        '<a href="https://example.com/posts/1">post</a>'
+        '<img src="https://example.com/blog/image.png" alt="&quot;x&quot;">'
+    )
+
+
+def test_sanitise_balances_tags():
+    assert sanitise("<p><b>bold<i>both</p>text &amp; <").html == (
+        "<p><b>bold<i>both</i></b></p>text &amp; &lt;"
+    )
+
+
+def test_sanitise_separates_blocks():
+    assert sanitise("<p>one</p><p>two<br>three</p>").text == "one two three"
+
+
+def test_make_excerpt():
+    assert make_excerpt("short") == "short"
+    assert make_excerpt("one two three, four", length=14) == "one two three…"
+    assert make_excerpt("a" * 20, length=10) == "a" * 10 + "…"
+
+
+def test_reading_time():
+    assert reading_time(0) == 0
+    assert reading_time(1) == 1
+    assert reading_time(401) == 3
+
+
+def test_process_entry():
+    entry = process_entry(
+        {"content": "<p>" + "word " * 250 + "</p>", "summary": "<b>hi</b><script>"},
+        base_url=None,
+    )
+    assert entry["summary"] == "<b>hi</b>"
+    assert entry["word_count"] == 250
+    assert entry["reading_time"] == 2
+    assert entry["excerpt"].endswith("…")
+
+    assert process_entry({"content": None}, base_url=None) == {
+        "content": None,
+        "excerpt": None,
+        "word_count": None,
+        "reading_time": None,
+    }
+
+
+def test_insert_entries_processes_content(app):
+    feed = Feed(title="test", site_link="https://example.com", feed_link="")
+    db.session.add(feed)
+    db.session.flush()
+
+    [id] = insert_entries(
+        feed.id,
+        [ParsedEntry(title="a", link="b", summary='<a href="/a">A</a> b c')],
+        base_url=feed.site_link,
+    )
+    db.session.expunge_all()
+
+    entry = db.session.get(Entry, id)
+    # Only the excerpt is loaded until the body is asked for
+    assert {"content", "summary"} <= inspect(entry).unloaded
+    assert entry.excerpt == "A b c"
+    assert entry.word_count == 3
+    assert entry.content == '<a href="https://example.com/a">A</a> b c'
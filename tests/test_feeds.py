@@ -1,39 +1,7 @@
-import pytest
-
-from feeder import create_app
 from feeder.db import db
 from feeder.models import Feed
 
-
-@pytest.fixture()
-def app():
-    app = create_app(db_uri="sqlite://")
-    app.config.update(
-        {
-            "TESTING": True,
-        }
-    )
-
-    with app.app_context():
-        yield app
-
-
-@pytest.fixture()
-def client(app):
-    return app.test_client()
-
-
-@pytest.fixture()
-def runner(app):
-    return app.test_cli_runner()
-
-
-def graphql(client, query, variables={}):
-    return client.post(
-        "/graphql",
-        json={"query": query, "variables": variables},
-        headers={"Content-Type": "application/json"},
-    )
+from .conftest import graphql
 
 
 def test_get_feed(client):
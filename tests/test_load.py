@@ -0,0 +1,65 @@
+import httpx
+import pytest
+import xmltodict
+from sqlalchemy import func, select
+
+from benchmarks.load import driver, feed_server, generate
+from feeder.db import db
+from feeder.models import Subscription, User, UserEntry
+from feeder.parser import make_parser
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = feed_server.start()
+    host, port = server.server_address
+    yield f"http://{host}:{port}"
+    server.shutdown()
+
+
+@pytest.mark.parametrize("kind", ["rss", "atom"])
+def test_feed_server(server_url, kind):
+    response = httpx.get(f"{server_url}/blog.{kind}?entries=3&size=50")
+    assert response.status_code == 200
+
+    feed, entries = make_parser(xmltodict.parse(response.content)).parse()
+    assert feed["title"] == "blog"
+    assert [entry.link for entry in entries] == [
+        f"https://blog.example.com/posts/{i}" for i in range(3)
+    ]
+    assert all(len(entry.content or entry.summary) > 50 for entry in entries)
+
+    response = httpx.get(
+        f"{server_url}/blog.{kind}?entries=3&size=50",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+
+
+def test_feed_server_errors(server_url):
+    assert httpx.get(f"{server_url}/blog.rss?status=503").status_code == 503
+    assert httpx.get(f"{server_url}/blog.rss?error_rate=1").status_code == 500
+    assert httpx.get(f"{server_url}/blog.html").status_code == 404
+
+
+def test_generate(app):
+    generate.generate(users=3, feeds=4, subscriptions=2, entries=5)
+
+    assert db.session.scalar(select(func.count(User.id))) == 4
+    assert db.session.scalar(select(func.count(Subscription.id))) == 6
+    assert db.session.scalar(select(func.count(UserEntry.id))) == 30
+
+
+def test_driver(tmp_path, monkeypatch, server_url):
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'db'}")
+    app = driver.create_app()
+    with app.app_context():
+        generate.generate(users=3, feeds=4, subscriptions=2, entries=5)
+
+    results, elapsed = driver.run(
+        app, duration=1, concurrency=2, feed_server=server_url
+    )
+
+    assert results
+    assert elapsed >= 1
+    assert all(result.ok for result in results)
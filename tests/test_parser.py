@@ -0,0 +1,106 @@
+import datetime as dt
+
+import xmltodict
+
+from feeder.parser import Entry, make_parser
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0">
+  <channel>
+    <title>Example</title>
+    <link>https://example.com</link>
+    <item>
+      <title>First</title>
+      <link>https://example.com/posts/first</link>
+      <description>Summary</description>
+      <pubDate>Mon, 03 Apr 2023 12:00:00 GMT</pubDate>
+    </item>
+    <item>
+      <title>Second</title>
+      <link>https://example.com/posts/second</link>
+    </item>
+  </channel>
+</rss>
+"""
+
+ATOM = """<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example</title>
+  <link href="https://example.com/" rel="alternate"/>
+  <link href="https://example.com/atom.xml" rel="self"/>
+  <entry>
+    <title type="html">First</title>
+    <link href="https://example.com/posts/first" rel="alternate"/>
+    <content type="html">&lt;p&gt;Content&lt;/p&gt;</content>
+    <updated>2023-04-03T12:00:00Z</updated>
+  </entry>
+</feed>
+"""
+
+
+def test_entry_link():
+    entry = Entry(link="https://example.com/posts/first")
+    assert entry.link == "https://example.com/posts/first"
+    assert entry.link_prefix == "https://example.com/posts/"
+    assert Entry(link=None).link is None
+    assert Entry(link="relative").link == "relative"
+
+
+def test_parse_rss():
+    feed, entries = make_parser(xmltodict.parse(RSS)).parse()
+
+    assert feed == {
+        "title": "Example",
+        "site_link": "https://example.com",
+        "feed_link": None,
+    }
+    assert [entry.as_dict() for entry in entries] == [
+        {
+            "title": "First",
+            "link": "https://example.com/posts/first",
+            "published": dt.datetime(2023, 4, 3, 12, tzinfo=dt.timezone.utc),
+            "updated": None,
+            "summary": "Summary",
+            "content": None,
+        },
+        {
+            "title": "Second",
+            "link": "https://example.com/posts/second",
+            "published": None,
+            "updated": None,
+            "summary": None,
+            "content": None,
+        },
+    ]
+    # Entries from the same feed share a single copy of the link prefix
+    first, second = entries
+    assert first.link_prefix is second.link_prefix
+
+
+def test_parse_atom():
+    feed, [entry] = make_parser(xmltodict.parse(ATOM)).parse()
+
+    assert feed == {
+        "title": "Example",
+        "site_link": "https://example.com/",
+        "feed_link": "https://example.com/atom.xml",
+    }
+    assert entry.title == "First"
+    assert entry.link == "https://example.com/posts/first"
+    assert entry.content == "<p>Content</p>"
+    assert entry.updated == dt.datetime(2023, 4, 3, 12, tzinfo=dt.timezone.utc)
+
+
+def test_parse_atom_odd_links():
+    atom = ATOM.replace(
+        "</feed>",
+        """
+        <entry><title>Text</title><link>https://example.com/posts/text</link></entry>
+        <entry><title>Bare</title><link rel="alternate"/></entry>
+        </feed>""",
+    )
+
+    _, [_, text, bare] = make_parser(xmltodict.parse(atom)).parse()
+
+    assert text.link == "https://example.com/posts/text"
+    assert bare.link is None
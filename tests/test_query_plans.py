@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from feeder.db import db
+from feeder.models import Entry, UserEntry
+
+from .conftest import graphql
+
+
+@contextmanager
+def capture_queries():
+    """Record every statement (and its parameters) sent to the database"""
+    queries = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *_):
+        queries.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def full_scans(statement, parameters):
+    """Return the EXPLAIN QUERY PLAN steps which walk an entire table"""
+    connection = db.engine.raw_connection()
+    try:
+        plan = connection.execute(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ).fetchall()
+    finally:
+        connection.close()
+    # Each row is (id, parent, notused, detail), indexed lookups are reported
+    # as SEARCH, everything else walks the whole table (or a whole index)
+    return [detail for *_, detail in plan if detail.startswith("SCAN")]
+
+
+def assert_no_full_scans(queries):
+    for statement, parameters in queries:
+        if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            continue
+        scans = full_scans(statement, parameters)
+        assert not scans, f"{scans} in:\n{statement}"
+
+
+@pytest.fixture()
+def subscription(subscription):
+    for i in range(5):
+        entry = Entry(
+            title=f"entry {i}", link=f"https://example.com/{i}", feed=subscription.feed
+        )
+        subscription.entries.append(UserEntry(user_id=1, entry=entry, read=False))
+    db.session.commit()
+    return subscription
+
+
+HOT_QUERIES = [
+    (
+        """
+        query GetSubscription($id: ID!) {
+          subscription(id: $id) {
+            unreadCount
+            feed { title }
+            category { name }
+            entries { read entry { title } }
+          }
+        }
+        """,
+        lambda subscription: {"id": subscription.id},
+    ),
+    (
+        """
+        query GetFeed($id: ID!) {
+          feed(id: $id) {
+            entries { title }
+            subscribers { unreadCount }
+          }
+        }
+        """,
+        lambda subscription: {"id": subscription.feed_id},
+    ),
+    (
+        """
+        query GetUser($id: ID!) {
+          user(id: $id) {
+            subscriptions { unreadCount }
+            categories { subscriptions { id } }
+            entries { read }
+          }
+        }
+        """,
+        lambda subscription: {"id": 1},
+    ),
+    (
+        """
+        mutation MarkAsRead($id: ID!, $userId: ID!) {
+          markAsRead(id: $id, userId: $userId) { read }
+        }
+        """,
+        lambda subscription: {"id": subscription.entries[0].id, "userId": 1},
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "query,variables", HOT_QUERIES, ids=["subscription", "feed", "user", "mark_as_read"]
+)
+def test_hot_queries_use_indexes(client, subscription, query, variables):
+    variables = variables(subscription)
+    # Make sure every query is emitted by the request rather than served from
+    # the identity map
+    db.session.expunge_all()
+
+    with capture_queries() as queries:
+        response = graphql(client, query, variables)
+
+    assert response.status_code == 200
+    assert "errors" not in response.json
+    assert queries
+    assert_no_full_scans(queries)
+
+
+def test_unread_count(client, subscription):
+    query = """
+    query GetSubscription($id: ID!) {
+      subscription(id: $id) { unreadCount }
+    }
+    """
+    response = graphql(client, query, {"id": subscription.id})
+    assert response.json["data"]["subscription"]["unreadCount"] == 5
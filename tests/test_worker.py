@@ -0,0 +1,242 @@
+import asyncio
+import datetime as dt
+import threading
+from itertools import count, islice
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from feeder import bulk, create_app, worker
+from feeder.bulk import SQLITE_MAX_VARIABLES
+from feeder.db import db
+from feeder.models import Entry, Feed, FeedLease, UserEntry
+from feeder.parser import Entry as ParsedEntry
+from feeder.worker import claim_feeds, release_feeds, run_worker, store_new_entries
+
+NOW = dt.datetime(2023, 4, 3, 12)
+YESTERDAY = NOW - dt.timedelta(days=1)
+
+unique = count()
+
+
+def add_feeds(size, refreshed_at=YESTERDAY):
+    feeds = [
+        Feed(
+            title=str(i),
+            feed_link=f"https://example.com/{i}.xml",
+            refreshed_at=refreshed_at,
+        )
+        for i in islice(unique, size)
+    ]
+    db.session.add_all(feeds)
+    db.session.commit()
+    return feeds
+
+
+def test_claim_feeds(app):
+    feeds = add_feeds(5)
+
+    first = claim_feeds("a", 3, now=NOW)
+    second = claim_feeds("b", 3, now=NOW)
+
+    assert len(first) == 3
+    assert len(second) == 2
+    assert set(first) | set(second) == {feed.id for feed in feeds}
+    assert claim_feeds("c", 3, now=NOW) == []
+
+
+def test_claim_feeds_skips_recently_refreshed(app):
+    add_feeds(2, refreshed_at=NOW - dt.timedelta(minutes=5))
+    [due] = add_feeds(1, refreshed_at=NOW - dt.timedelta(hours=1))
+
+    assert claim_feeds("a", 10, now=NOW) == [due.id]
+
+
+def test_claim_feeds_reclaims_expired_leases(app):
+    [feed] = add_feeds(1)
+    lease = dt.timedelta(minutes=5)
+
+    assert claim_feeds("a", 1, lease_duration=lease, now=NOW) == [feed.id]
+    later = NOW + dt.timedelta(minutes=4)
+    assert claim_feeds("b", 1, lease_duration=lease, now=later) == []
+
+    # a died without releasing the feed
+    later = NOW + dt.timedelta(minutes=6)
+    assert claim_feeds("b", 1, lease_duration=lease, now=later) == [feed.id]
+    assert db.session.get(FeedLease, feed.id).worker == "b"
+
+
+def test_release_feeds(app):
+    [feed] = add_feeds(1)
+    claim_feeds("a", 1, now=NOW)
+
+    release_feeds("a", [feed.id], now=NOW)
+
+    assert db.session.get(FeedLease, feed.id) is None
+    assert db.session.get(Feed, feed.id).refreshed_at == NOW
+    assert claim_feeds("b", 1, now=NOW) == []
+
+
+def test_concurrent_workers_claim_each_feed_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'db'}")
+    app = create_app()
+    with app.app_context():
+        add_feeds(200)
+
+    claimed = []
+
+    def work(name):
+        with app.app_context():
+            while feed_ids := claim_feeds(name, 7, now=NOW):
+                db.session.commit()
+                claimed.extend(feed_ids)
+                release_feeds(name, feed_ids, now=NOW)
+                db.session.commit()
+
+    workers = [threading.Thread(target=work, args=(str(i),)) for i in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(claimed) == 200
+    assert len(set(claimed)) == 200
+
+
+@pytest.fixture()
+def subscription(subscription):
+    subscription.feed.refreshed_at = YESTERDAY
+    db.session.commit()
+    return subscription
+
+
+def test_run_worker(subscription, serve_feeds):
+    feed = subscription.feed
+    db.session.add(Entry(title="Old", link="https://example.com/old", feed=feed))
+    db.session.commit()
+
+    serve_feeds("""<?xml version="1.0"?>
+    <rss version="2.0">
+      <channel>
+        <title>Example</title>
+        <item><title>Old</title><link>https://example.com/old</link></item>
+        <item><title>New</title><link>https://example.com/new</link></item>
+      </channel>
+    </rss>
+    """)
+
+    asyncio.run(run_worker("a", once=True))
+
+    titles = db.session.scalars(select(Entry.title).where(Entry.feed_id == feed.id))
+    assert sorted(titles) == ["New", "Old"]
+    assert (
+        db.session.scalar(
+            select(func.count(UserEntry.id)).where(
+                UserEntry.subscription_id == subscription.id
+            )
+        )
+        == 1
+    )
+    assert db.session.get(Feed, feed.id).refreshed_at is not None
+    assert db.session.scalar(select(func.count()).select_from(FeedLease)) == 0
+
+
+@pytest.mark.parametrize("status", [404, 500])
+def test_run_worker_survives_failed_fetch(app, serve_feeds, status):
+    add_feeds(2)
+    serve_feeds(lambda request: httpx.Response(status))
+
+    asyncio.run(run_worker("a", once=True))
+
+    assert claim_feeds("b", 10) == []
+
+
+def test_store_new_entries_skips_repeated_links(subscription):
+    feed = subscription.feed
+    entries = [
+        ParsedEntry(title="First", link="https://example.com/1"),
+        ParsedEntry(title="Again", link="https://example.com/1"),
+        ParsedEntry(title="Second", link="https://example.com/2"),
+    ]
+
+    assert len(store_new_entries(feed, entries)) == 2
+    assert store_new_entries(feed, entries) == []
+    titles = db.session.scalars(select(Entry.title).where(Entry.feed_id == feed.id))
+    assert sorted(titles) == ["First", "Second"]
+    db.session.expire(subscription)
+    assert subscription.unread_count == 2
+
+
+def test_store_new_entries_with_more_links_than_variables(subscription):
+    feed = subscription.feed
+    size = SQLITE_MAX_VARIABLES * 2
+    entries = [
+        ParsedEntry(title=str(i), link=f"https://example.com/{i}") for i in range(size)
+    ]
+    # Some already known links fall beyond the first chunk
+    store_new_entries(feed, entries[::100])
+
+    assert len(store_new_entries(feed, entries)) == size - len(entries[::100])
+    assert (
+        db.session.scalar(select(func.count(Entry.id)).where(Entry.feed_id == feed.id))
+        == size
+    )
+
+
+def test_run_worker_stores_items_missing_fields(subscription, serve_feeds):
+    # Items only need a title or a description, the link is optional too
+    serve_feeds("""<?xml version="1.0"?>
+    <rss version="2.0"><channel><title>Example</title>
+      <item><title>Fine</title><link>https://example.com/fine</link></item>
+      <item><link>https://example.com/untitled</link></item>
+      <item><description>Untitled and unlinked</description></item>
+    </channel></rss>
+    """)
+
+    asyncio.run(run_worker("a", once=True))
+
+    titles = db.session.scalars(
+        select(Entry.title).where(Entry.feed_id == subscription.feed_id)
+    )
+    assert sorted(titles) == ["Fine", "https://example.com/untitled"]
+    assert subscription.unread_count == 2
+
+
+def test_run_worker_skips_feeds_that_cant_be_stored(
+    subscription, serve_feeds, monkeypatch
+):
+    good = subscription.feed
+    [bad] = add_feeds(1)
+
+    def respond(request):
+        return httpx.Response(
+            200,
+            text=f"""<?xml version="1.0"?>
+            <rss version="2.0"><channel><title>Example</title>
+            <item><title>Fine</title><link>{request.url}/entry</link></item>
+            </channel></rss>""",
+        )
+
+    serve_feeds(respond)
+
+    def insert_entries(feed_id, entries, base_url=None):
+        if feed_id == bad.id:
+            raise IntegrityError("INSERT", {}, Exception("broken"))
+        return bulk.insert_entries(feed_id, entries, base_url)
+
+    monkeypatch.setattr(worker, "insert_entries", insert_entries)
+
+    asyncio.run(run_worker("a", once=True))
+
+    titles = db.session.scalars(select(Entry.title).where(Entry.feed_id == good.id))
+    assert titles.all() == ["Fine"]
+    assert subscription.unread_count == 1
+    assert (
+        db.session.scalar(select(func.count(Entry.id)).where(Entry.feed_id == bad.id))
+        == 0
+    )
+    # Both were released, so neither gets picked up again straight away
+    assert db.session.scalar(select(func.count()).select_from(FeedLease)) == 0
+    assert claim_feeds("b", 10) == []